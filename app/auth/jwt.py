@@ -1,87 +1,179 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import hashlib
+import threading
+import time
+from cachetools import TTLCache
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
 from app.config import JWT_SECRET, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 from app.database import get_db
 from app.models.models import User
 from app.schemas.user import TokenData
 
-#  hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+#  hashing: built on first use so token-only requests never load passlib or the
+#  hash backends
+_pwd_context = None
+
+def _get_pwd_context():
+    """Return the shared CryptContext, creating it on first call.
+
+    New hashes use argon2id; existing bcrypt hashes still verify and get rehashed
+    on the next successful login.
+    """
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["argon2", "bcrypt"],
+            default="argon2",
+            deprecated="auto",
+            argon2__memory_cost=19456,
+            argon2__time_cost=2,
+            argon2__parallelism=1,
+        )
+    return _pwd_context
 
 # scheme for token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
-def verify_password(plain_password, hashed_password):
-    """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+# Decoded tokens, keyed by a digest of the raw token. Each entry also carries the
+# token's own expiry so nothing is served from the cache after the token is dead.
+TOKEN_CACHE_TTL_SECONDS = 60
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+# Hashing is CPU-bound and blocking: only call these from sync (`def`) endpoints,
+# which FastAPI runs in its threadpool, or wrap them in run_in_threadpool.
+def verify_and_update_password(plain_password, hashed_password):
+    """Verify a password and return (valid, new_hash).
+
+    new_hash is set when the stored hash uses a deprecated scheme or outdated
+    parameters and should be replaced.
+    """
+    return _get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password):
     """Generate a password hash."""
-    return pwd_context.hash(password)
+    return _get_pwd_context().hash(password)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create a new JWT token."""
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    now: Optional[datetime] = None
+):
+    """Create a new JWT token, optionally reusing the caller's current time."""
     to_encode = data.copy()
+    now = now or datetime.utcnow()
     
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get the current user from the token."""
-    credentials_exception = HTTPException(
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _get_cached_token_data(key: str) -> Optional[TokenData]:
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, token_data = entry
+    if expires_at <= time.time():
+        with _token_cache_lock:
+            _token_cache.pop(key, None)
+        return None
+    return token_data
+
+def _cache_token_data(key: str, token_data: TokenData, exp: Optional[int]):
+    """Cache a successfully decoded token until min(cache TTL, token expiry)."""
+    now = time.time()
+    expires_at = now + TOKEN_CACHE_TTL_SECONDS
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    if expires_at <= now:
+        return
+    with _token_cache_lock:
+        _token_cache[key] = (expires_at, token_data)
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    try:
-        
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: int = payload.get("sub")
-        username: str = payload.get("username")
-        is_admin: bool = payload.get("is_admin", False)
-        
-        if user_id is None:
-            raise credentials_exception
+
+def get_current_user_from_token(token: str = Depends(oauth2_scheme)):
+    """Get the current user's identity from the token claims alone, without a DB lookup.
+
+    Deactivation is only observed once the token expires; endpoints that must see
+    it immediately should depend on get_current_user_db instead.
+    """
+    cache_key = _token_cache_key(token)
+    token_data = _get_cached_token_data(cache_key)
+
+    if token_data is None:
+        try:
+            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            user_id: int = payload.get("sub")
+            username: str = payload.get("username")
+            is_admin: bool = payload.get("is_admin", False)
+            is_active: bool = payload.get("is_active", True)
             
-        token_data = TokenData(user_id=user_id, username=username, is_admin=is_admin)
-    except JWTError:
-        raise credentials_exception
+            if user_id is None:
+                raise _credentials_exception()
+                
+            token_data = TokenData(
+                user_id=user_id,
+                username=username,
+                is_admin=is_admin,
+                is_active=is_active
+            )
+        except jwt.InvalidTokenError:
+            raise _credentials_exception()
+
+        # Only tokens that passed validation ever make it into the cache
+        _cache_token_data(cache_key, token_data, payload.get("exp"))
+
+    if not token_data.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
         
+    return token_data
+
+def get_current_user_db(
+    token_data: TokenData = Depends(get_current_user_from_token),
+    db: Session = Depends(get_db)
+):
+    """Get the current user from the database, re-checking that they are still active."""
     # Get the user from the database
     user = db.query(User).filter(User.id == token_data.user_id).first()
     
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
         
     return user
 
-def get_current_active_user(current_user: User = Depends(get_current_user)):
-    """Get the current active user."""
-    if not current_user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
+# get_current_user_db already rejects inactive users
+get_current_active_user = get_current_user_db
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
-    """Get the current admin user."""
+def get_current_admin_user(current_user: User = Depends(get_current_user_db)):
+    """Get the current admin user, checked against the DB so demotion applies immediately."""
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
@@ -1,18 +1,88 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_ASYNC_POOL_SIZE,
+    DB_ASYNC_MAX_OVERFLOW,
+    DB_POOL_RECYCLE_SECONDS
+)
 
+# Compiled SQL cache size; comfortably above the number of distinct statements the app issues
+QUERY_CACHE_SIZE = 1200
 
+if DATABASE_URL.startswith('sqlite'):
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        query_cache_size=QUERY_CACHE_SIZE
+    )
+else:
+    engine = create_engine(
+        DATABASE_URL,
+        query_cache_size=QUERY_CACHE_SIZE,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS
+    )
+
+# libpq query parameters asyncpg cannot take as connect() arguments at all
+_ASYNCPG_UNSUPPORTED_PARAMS = {"sslrootcert", "sslcert", "sslkey", "sslcrl", "sslpassword"}
+
+def _async_database_url(url: str):
+    """Map the configured sync URL onto its async driver (asyncpg / aiosqlite).
+
+    Returns the URL plus any connect_args needed to carry over libpq-only
+    query parameters that asyncpg spells differently.
+    """
+    db_url = make_url(url)
+    if db_url.drivername.startswith("sqlite"):
+        return db_url.set(drivername="sqlite+aiosqlite"), {}
+    if not db_url.drivername.startswith(("postgresql", "postgres")):
+        return db_url, {}
+
+    unsupported = _ASYNCPG_UNSUPPORTED_PARAMS.intersection(db_url.query)
+    if unsupported:
+        raise ValueError(
+            f"DATABASE_URL parameters not supported by asyncpg: {', '.join(sorted(unsupported))}"
+        )
+
+    query = dict(db_url.query)
+    connect_args = {}
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    if "connect_timeout" in query:
+        connect_args["timeout"] = float(query.pop("connect_timeout"))
+    return db_url.set(drivername="postgresql+asyncpg", query=query), connect_args
+
+# Async engine for the read-heavy list endpoints
+ASYNC_DATABASE_URL, _async_connect_args = _async_database_url(DATABASE_URL)
 
 if DATABASE_URL.startswith('sqlite'):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        query_cache_size=QUERY_CACHE_SIZE
+    )
 else:
-    engine = create_engine(DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=_async_connect_args,
+        query_cache_size=QUERY_CACHE_SIZE,
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS
+    )
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 Base = declarative_base()
@@ -23,4 +93,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,8 @@
+from datetime import datetime
+from fastapi import Request
+
+def request_now(request: Request) -> datetime:
+    """Current UTC time, read once per request and shared by everything in it."""
+    if not hasattr(request.state, "now"):
+        request.state.now = datetime.utcnow()
+    return request.state.now
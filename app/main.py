@@ -1,10 +1,15 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+import asyncio
 import uvicorn
 
-from app.database import get_db, engine
+from app.config import EXPIRED_CHECK_INTERVAL_SECONDS
+from app.database import get_db, engine, async_engine
 from app.models.models import Base, User, Plan, Subscription
 from app.routes import plans, subscriptions, auth
 from app.services import subscription_service
@@ -12,9 +17,31 @@ from app.services import subscription_service
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+async def _periodic_expired_check():
+    """Run the expired-subscription sweep now and then every interval, off the event loop."""
+    while True:
+        await run_in_threadpool(subscription_service.check_expired_subscriptions)
+        await asyncio.sleep(EXPIRED_CHECK_INTERVAL_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweep_task = asyncio.create_task(_periodic_expired_check())
+    try:
+        yield
+    finally:
+        sweep_task.cancel()
+        try:
+            await sweep_task
+        except asyncio.CancelledError:
+            pass
+        await async_engine.dispose()
+
 app = FastAPI(title="Subscription Service API", 
               description="API for managing subscription plans and user subscriptions",
-              version="1.0.0")
+              version="1.0.0",
+              default_response_class=ORJSONResponse,
+              lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -31,11 +58,6 @@ app.include_router(plans.router, tags=["Plans"])
 app.include_router(subscriptions.router, tags=["Subscriptions"])
 
 
-@app.on_event("startup")
-async def startup_event():
-    
-    subscription_service.check_expired_subscriptions()
-
 @app.get("/", tags=["Root"])
 async def root():
     return {"message": "Welcome to the Subscription Service API"}
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -32,7 +32,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(100), unique=True, index=True, nullable=False)
     username = Column(String(50), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(100), nullable=False)
+    hashed_password = Column(String(128), nullable=False)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -45,8 +45,8 @@ class Subscription(Base):
     __tablename__ = "subscriptions"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False, index=True)
     start_date = Column(DateTime, nullable=False, default=datetime.utcnow)
     end_date = Column(DateTime, nullable=False)
     status = Column(Enum(SubscriptionStatus), default=SubscriptionStatus.ACTIVE)
@@ -56,4 +56,16 @@ class Subscription(Base):
 
     # Relationships
     user = relationship("User", back_populates="subscriptions")
-    plan = relationship("Plan", back_populates="subscriptions")
\ No newline at end of file
+    plan = relationship("Plan", back_populates="subscriptions")
+
+    __table_args__ = (
+        # Expiry sweep: status = ACTIVE AND end_date < now
+        Index("ix_subscriptions_status_end_date", "status", "end_date"),
+        # Active subscription lookup per user; partial on backends that support it
+        Index(
+            "ix_subscriptions_active_user",
+            "user_id",
+            postgresql_where=text("status = 'ACTIVE'"),
+            sqlite_where=text("status = 'ACTIVE'"),
+        ),
+    )
\ No newline at end of file
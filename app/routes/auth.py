@@ -1,36 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models.models import User
 from app.schemas.user import UserCreate, UserResponse, Token
 from app.auth.jwt import (
-    verify_password, 
+    verify_and_update_password, 
     get_password_hash, 
     create_access_token, 
     get_current_active_user,
     get_current_admin_user
 )
 from app.config import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.dependencies import request_now
 
 router = APIRouter(prefix="/api/v1/auth")
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
+    # Kept sync on purpose: password hashing must not run on the event loop.
     
-    db_user_email = db.query(User).filter(User.email == user.email).first()
-    if db_user_email:
+    email_exists = db.query(
+        db.query(User.id).filter(User.email == user.email).exists()
+    ).scalar()
+    if email_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     
-    db_user_username = db.query(User).filter(User.username == user.username).first()
-    if db_user_username:
+    username_exists = db.query(
+        db.query(User.id).filter(User.username == user.username).exists()
+    ).scalar()
+    if username_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
@@ -53,17 +59,31 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 @router.post("/login", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    now: datetime = Depends(request_now)
+):
     """Login to get access token."""
+    # Kept sync on purpose: password verification must not run on the event loop.
     
     user = db.query(User).filter(User.username == form_data.username).first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = verify_and_update_password(form_data.password, user.hashed_password)
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Upgrade legacy (bcrypt) or outdated hashes now that we have the plaintext
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
  
     if not user.is_active:
         raise HTTPException(
@@ -74,8 +94,14 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "username": user.username, "is_admin": user.is_admin},
-        expires_delta=access_token_expires
+        data={
+            "sub": str(user.id),
+            "username": user.username,
+            "is_admin": user.is_admin,
+            "is_active": user.is_active
+        },
+        expires_delta=access_token_expires,
+        now=now
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
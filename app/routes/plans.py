@@ -1,39 +1,74 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
+import hashlib
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.models import Plan, User
 from app.schemas.plan import PlanCreate, PlanResponse, PlanUpdate
-from app.auth.jwt import get_current_active_user, get_current_admin_user
+from app.schemas.user import TokenData
+from app.auth.jwt import get_current_user_from_token, get_current_admin_user
+from app.services.plan_service import get_plan_cached, invalidate_plan
 
 router = APIRouter(prefix="/api/v1/plans")
 
+# The plan catalog changes rarely, so clients may reuse responses briefly and
+# revalidate them cheaply with If-None-Match
+PLAN_CACHE_CONTROL = "private, max-age=60"
+_plan_list_adapter = TypeAdapter(List[PlanResponse])
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header value."""
+    def opaque(tag: str) -> str:
+        return tag[2:] if tag.startswith("W/") else tag
+
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or opaque(etag) in (opaque(tag) for tag in candidates)
+
+def _cacheable_json_response(request: Request, body: bytes) -> Response:
+    """Return a JSON body with ETag/Cache-Control, or 304 if the client's copy is current."""
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": PLAN_CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/", response_model=List[PlanResponse])
-def get_all_plans(
+async def get_all_plans(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     active_only: bool = True,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenData = Depends(get_current_user_from_token)
 ):
     """Get all subscription plans."""
-    query = db.query(Plan)
+    query = select(Plan)
     
     if active_only:
-        query = query.filter(Plan.is_active == True)
+        query = query.where(Plan.is_active == True)
         
-    plans = query.offset(skip).limit(limit).all()
-    return plans
+    result = await db.execute(query.offset(skip).limit(limit))
+    plans = result.scalars().all()
+    body = _plan_list_adapter.dump_json(
+        _plan_list_adapter.validate_python(plans, from_attributes=True)
+    )
+    return _cacheable_json_response(request, body)
 
 @router.get("/{plan_id}", response_model=PlanResponse)
 def get_plan(
     plan_id: int, 
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token)
 ):
     """Get a specific subscription plan by ID."""
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = get_plan_cached(plan_id, db)
     
     if not plan:
         raise HTTPException(
@@ -41,7 +76,8 @@ def get_plan(
             detail=f"Plan with ID {plan_id} not found"
         )
         
-    return plan
+    body = plan.model_dump_json().encode()
+    return _cacheable_json_response(request, body)
 
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
 def create_plan(
@@ -51,15 +87,17 @@ def create_plan(
 ):
     """Create a new subscription plan (admin only)."""
     
-    db_plan = db.query(Plan).filter(Plan.name == plan.name).first()
-    if db_plan:
+    name_exists = db.query(
+        db.query(Plan.id).filter(Plan.name == plan.name).exists()
+    ).scalar()
+    if name_exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Plan with name '{plan.name}' already exists"
         )
     
     # Create new plan
-    new_plan = Plan(**plan.dict())
+    new_plan = Plan(**plan.model_dump())
     db.add(new_plan)
     db.commit()
     db.refresh(new_plan)
@@ -82,11 +120,13 @@ def update_plan(
             detail=f"Plan with ID {plan_id} not found"
         )
     
-    update_data = plan_update.dict(exclude_unset=True)
+    update_data = plan_update.model_dump(exclude_unset=True)
     
     # If name is being updated, check if it's unique
     if "name" in update_data and update_data["name"] != db_plan.name:
-        name_exists = db.query(Plan).filter(Plan.name == update_data["name"]).first()
+        name_exists = db.query(
+            db.query(Plan.id).filter(Plan.name == update_data["name"]).exists()
+        ).scalar()
         if name_exists:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -99,10 +139,11 @@ def update_plan(
     
     db.commit()
     db.refresh(db_plan)
+    invalidate_plan(plan_id)
     
     return db_plan
 
-@router.delete("/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{plan_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 def delete_plan(
     plan_id: int, 
     db: Session = Depends(get_db),
@@ -120,5 +161,6 @@ def delete_plan(
     # Delete the plan
     db.delete(db_plan)
     db.commit()
+    invalidate_plan(plan_id)
     
-    return None
\ No newline at end of file
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from pydantic import TypeAdapter
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List
 from datetime import datetime, timedelta
 
-from app.database import get_db
+from app.database import get_db, get_async_db
+from app.dependencies import request_now
 from app.models.models import Subscription, Plan, User, SubscriptionStatus
 from app.schemas.subscription import (
     SubscriptionCreate, 
@@ -11,55 +15,77 @@ from app.schemas.subscription import (
     SubscriptionUpdate,
     SubscriptionDetailResponse
 )
-from app.auth.jwt import get_current_active_user, get_current_admin_user
+from app.schemas.user import TokenData
+from app.auth.jwt import get_current_user_from_token, get_current_admin_user
+from app.services.plan_service import get_plan_cached, peek_cached_plan
 from app.services.subscription_service import check_expired_subscriptions
 
 router = APIRouter(prefix="/api/v1/subscriptions")
 
+# Built once; used to serialize the admin listing straight to JSON bytes
+_subscription_list_adapter = TypeAdapter(List[SubscriptionDetailResponse])
+
 @router.post("/", response_model=SubscriptionResponse, status_code=status.HTTP_201_CREATED)
 def create_subscription(
     subscription: SubscriptionCreate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token),
+    now: datetime = Depends(request_now)
 ):
     """Create a new subscription."""
+    # User, plan and active-subscription checks in a single round trip; the plan
+    # columns are only queried when the plan isn't already cached
+    plan = peek_cached_plan(subscription.plan_id)
+    columns = [
+        exists().where(User.id == subscription.user_id).label("user_exists"),
+        exists().where(
+            Subscription.user_id == subscription.user_id,
+            Subscription.status == SubscriptionStatus.ACTIVE
+        ).label("has_active_subscription")
+    ]
+    if plan is None:
+        columns += [
+            select(Plan.is_active).where(Plan.id == subscription.plan_id)
+                .scalar_subquery().label("plan_is_active"),
+            select(Plan.duration_days).where(Plan.id == subscription.plan_id)
+                .scalar_subquery().label("plan_duration_days")
+        ]
+    checks = db.execute(select(*columns)).one()
+
+    if plan is not None:
+        plan_is_active, plan_duration_days = plan.is_active, plan.duration_days
+    else:
+        plan_is_active, plan_duration_days = checks.plan_is_active, checks.plan_duration_days
    
-    user = db.query(User).filter(User.id == subscription.user_id).first()
-    if not user:
+    if not checks.user_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID {subscription.user_id} not found"
         )
    
-    plan = db.query(Plan).filter(Plan.id == subscription.plan_id).first()
-    if not plan:
+    # duration_days is NOT NULL, so a NULL here means there is no such plan
+    if plan_duration_days is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Plan with ID {subscription.plan_id} not found"
         )
     
   
-    if not plan.is_active:
+    if not plan_is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Plan with ID {subscription.plan_id} is not active"
         )
     
-   
-    active_subscription = db.query(Subscription).filter(
-        Subscription.user_id == subscription.user_id,
-        Subscription.status == SubscriptionStatus.ACTIVE
-    ).first()
-    
-    if active_subscription:
+    if checks.has_active_subscription:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User already has an active subscription"
         )
     
     # Calculate start and end dates
-    start_date = datetime.utcnow()
-    end_date = start_date + timedelta(days=plan.duration_days)
+    start_date = now
+    end_date = start_date + timedelta(days=plan_duration_days)
     
     # Create new subscription
     new_subscription = Subscription(
@@ -77,78 +103,92 @@ def create_subscription(
     return new_subscription
 
 @router.get("/", response_model=List[SubscriptionDetailResponse])
-def get_all_subscriptions(
+async def get_all_subscriptions(
     skip: int = 0, 
     limit: int = 100, 
     status: SubscriptionStatus = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin_user)
 ):
     """Get all subscriptions (admin only)."""
-    query = db.query(Subscription)
+    query = select(Subscription).options(
+        selectinload(Subscription.plan),
+        selectinload(Subscription.user)
+    )
     
     if status:
-        query = query.filter(Subscription.status == status)
+        query = query.where(Subscription.status == status)
         
-    subscriptions = query.offset(skip).limit(limit).all()
-    return subscriptions
+    result = await db.execute(query.offset(skip).limit(limit))
+    subscriptions = result.scalars().all()
+    validated = _subscription_list_adapter.validate_python(subscriptions, from_attributes=True)
+    return Response(
+        content=_subscription_list_adapter.dump_json(validated),
+        media_type="application/json"
+    )
 
 @router.get("/user/{user_id}", response_model=List[SubscriptionResponse])
-def get_user_subscriptions(
+async def get_user_subscriptions(
     user_id: int, 
     status: SubscriptionStatus = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: TokenData = Depends(get_current_user_from_token)
 ):
     """Get all subscriptions for a specific user."""
    
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user_exists = await db.scalar(select(exists().where(User.id == user_id)))
+    if not user_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID {user_id} not found"
         )
     
     # Check if the current user is the requested user or an admin
-    if current_user.id != user_id and not current_user.is_admin:
+    if current_user.user_id != user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
         )
     
     # Get subscriptions
-    query = db.query(Subscription).filter(Subscription.user_id == user_id)
+    query = select(Subscription).where(Subscription.user_id == user_id)
     
     if status:
-        query = query.filter(Subscription.status == status)
+        query = query.where(Subscription.status == status)
         
-    subscriptions = query.all()
+    result = await db.execute(query)
+    subscriptions = result.scalars().all()
     return subscriptions
 
 @router.get("/user/{user_id}/active", response_model=SubscriptionDetailResponse)
 def get_active_subscription(
     user_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token)
 ):
     """Get the active subscription for a specific user."""
     
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+    user_exists = db.query(
+        db.query(User.id).filter(User.id == user_id).exists()
+    ).scalar()
+    if not user_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User with ID {user_id} not found"
         )
     
  
-    if current_user.id != user_id and not current_user.is_admin:
+    if current_user.user_id != user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
         )
     
 
-    subscription = db.query(Subscription).filter(
+    subscription = db.query(Subscription).options(
+        joinedload(Subscription.plan),
+        joinedload(Subscription.user)
+    ).filter(
         Subscription.user_id == user_id,
         Subscription.status == SubscriptionStatus.ACTIVE
     ).first()
@@ -165,11 +205,14 @@ def get_active_subscription(
 def get_subscription(
     subscription_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token)
 ):
     """Get a specific subscription by ID."""
     # Get the subscription
-    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    subscription = db.query(Subscription).options(
+        joinedload(Subscription.plan),
+        joinedload(Subscription.user)
+    ).filter(Subscription.id == subscription_id).first()
     
     if not subscription:
         raise HTTPException(
@@ -178,7 +221,7 @@ def get_subscription(
         )
     
     
-    if current_user.id != subscription.user_id and not current_user.is_admin:
+    if current_user.user_id != subscription.user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
@@ -191,7 +234,8 @@ def update_subscription(
     subscription_id: int, 
     subscription_update: SubscriptionUpdate, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token),
+    now: datetime = Depends(request_now)
 ):
     """Update a subscription."""
     # Get the subscription
@@ -204,18 +248,18 @@ def update_subscription(
         )
     
    
-    if current_user.id != subscription.user_id and not current_user.is_admin:
+    if current_user.user_id != subscription.user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
         )
    
-    update_data = subscription_update.dict(exclude_unset=True)
+    update_data = subscription_update.model_dump(exclude_unset=True)
     
    
     if "plan_id" in update_data:
         # Check if the plan exists
-        plan = db.query(Plan).filter(Plan.id == update_data["plan_id"]).first()
+        plan = get_plan_cached(update_data["plan_id"], db)
         if not plan:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -230,17 +274,17 @@ def update_subscription(
             )
         
        
-        days_left = (subscription.end_date - datetime.utcnow()).days
+        days_left = (subscription.end_date - now).days
         if days_left < 0:
             days_left = 0
         
         
-        new_end_date = datetime.utcnow() + timedelta(days=plan.duration_days + days_left)
+        new_end_date = now + timedelta(days=plan.duration_days + days_left)
         update_data["end_date"] = new_end_date
     
  
     if "status" in update_data and update_data["status"] == SubscriptionStatus.CANCELLED:
-        update_data["cancelled_at"] = datetime.utcnow()
+        update_data["cancelled_at"] = now
     
     # Update the subscription
     for key, value in update_data.items():
@@ -251,11 +295,12 @@ def update_subscription(
     
     return subscription
 
-@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT, response_class=Response)
 def cancel_subscription(
     subscription_id: int, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: TokenData = Depends(get_current_user_from_token),
+    now: datetime = Depends(request_now)
 ):
     """Cancel a subscription."""
     # Get the subscription
@@ -268,7 +313,7 @@ def cancel_subscription(
         )
     
     
-    if current_user.id != subscription.user_id and not current_user.is_admin:
+    if current_user.user_id != subscription.user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this resource"
@@ -282,11 +327,11 @@ def cancel_subscription(
     
     # Cancel the subscription
     subscription.status = SubscriptionStatus.CANCELLED
-    subscription.cancelled_at = datetime.utcnow()
+    subscription.cancelled_at = now
     
     db.commit()
     
-    return None
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.post("/check-expired", status_code=status.HTTP_200_OK)
 def check_expired(
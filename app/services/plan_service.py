@@ -0,0 +1,51 @@
+import threading
+from typing import Optional
+from cachetools import TTLCache
+from sqlalchemy.orm import Session
+
+from app.models.models import Plan
+from app.schemas.plan import PlanResponse
+
+# Process-local snapshots of plans by ID. The catalog is small and admin-managed,
+# so other workers may serve a changed plan for up to the TTL before it expires.
+PLAN_CACHE_TTL_SECONDS = 300
+_plan_cache = TTLCache(maxsize=256, ttl=PLAN_CACHE_TTL_SECONDS)
+_plan_cache_lock = threading.Lock()
+# Bumped on every invalidation; a lookup only stores its result if no
+# invalidation happened while it was reading, so a row read before a
+# concurrent update commits can't be cached after that update's invalidation
+_plan_cache_generation = 0
+
+def peek_cached_plan(plan_id: int) -> Optional[PlanResponse]:
+    """Get a cached plan snapshot by ID without falling back to the database."""
+    with _plan_cache_lock:
+        return _plan_cache.get(plan_id)
+
+def get_plan_cached(plan_id: Optional[int], db: Session) -> Optional[PlanResponse]:
+    """Get a plan by ID, serving a cached snapshot when there is one."""
+    if plan_id is None:
+        return None
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(plan_id)
+        generation = _plan_cache_generation
+    if plan is not None:
+        return plan
+
+    db_plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    if db_plan is None:
+        return None
+
+    # Cache a detached snapshot, never the ORM instance tied to this session
+    plan = PlanResponse.model_validate(db_plan)
+    with _plan_cache_lock:
+        if generation == _plan_cache_generation:
+            _plan_cache[plan_id] = plan
+    return plan
+
+def invalidate_plan(plan_id: int):
+    """Drop a plan from this process's cache after its change is committed."""
+    global _plan_cache_generation
+    with _plan_cache_lock:
+        _plan_cache_generation += 1
+        _plan_cache.pop(plan_id, None)
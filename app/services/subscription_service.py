@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
 import logging
 
 from app.database import SessionLocal
@@ -17,21 +18,20 @@ def check_expired_subscriptions():
     db = SessionLocal()
     
     try:
-        # Get all active subscriptions that have expired
-        expired_subscriptions = db.query(Subscription).filter(
-            Subscription.status == SubscriptionStatus.ACTIVE,
-            Subscription.end_date < datetime.utcnow()
-        ).all()
-        
-       
-        for subscription in expired_subscriptions:
-            subscription.status = SubscriptionStatus.EXPIRED
-            logger.info(f"Marking subscription {subscription.id} as EXPIRED")
-        
-       
+        # Expire all overdue active subscriptions in a single set-based UPDATE
+        stmt = (
+            update(Subscription)
+            .where(
+                Subscription.status == SubscriptionStatus.ACTIVE,
+                Subscription.end_date < datetime.utcnow()
+            )
+            .values(status=SubscriptionStatus.EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        result = db.execute(stmt)
         db.commit()
         
-        logger.info(f"Updated {len(expired_subscriptions)} expired subscriptions")
+        logger.info(f"Updated {result.rowcount} expired subscriptions")
         
     except Exception as e:
         logger.error(f"Error checking expired subscriptions: {str(e)}")
@@ -42,7 +42,10 @@ def check_expired_subscriptions():
 def get_subscription_details(subscription_id: int, db: Session):
     """Get detailed information about a subscription."""
     # Get the subscription with plan and user details
-    subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
+    subscription = db.query(Subscription).options(
+        joinedload(Subscription.plan),
+        joinedload(Subscription.user)
+    ).filter(Subscription.id == subscription_id).first()
     
     if not subscription:
         return None